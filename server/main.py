@@ -1,11 +1,19 @@
+import asyncio
+import atexit
 import json
+import logging
 import os
+import queue
+import re
+import secrets
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache, partial
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from uuid import uuid4
-from typing import Any, Dict, List, Literal, Optional
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Literal, Optional, Tuple
 
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
@@ -17,11 +25,31 @@ from starlette.responses import Response
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
 from dotenv import load_dotenv
 from amadeus import Client, ResponseError, Location
-from pydantic import BaseModel, Field
+from cachetools import LRUCache, TTLCache
+import orjson
+from redis import asyncio as aioredis
+from redis.exceptions import RedisError
+from pydantic import BaseModel, ConfigDict, Field
 
 # Load environment variables
 load_dotenv()
 
+# Diagnostics go through logging so disabled levels cost neither formatting nor stdout I/O.
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper(), format=LOG_FORMAT)
+logger = logging.getLogger("tripcanvas")
+
+# App records are handed to a background thread for writing, so a slow log sink
+# never blocks the event loop.
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, _log_stream_handler)
+logger.addHandler(QueueHandler(_log_queue))
+logger.propagate = False
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 # Initialize Amadeus Client
 try:
     amadeus = Client(
@@ -29,29 +57,49 @@ try:
         client_secret=os.getenv("AMADEUS_API_SECRET")
     )
 except Exception as e:
-    print(f"Warning: Amadeus Client failed to initialize: {e}")
+    logger.warning("Amadeus Client failed to initialize: %s", e)
     amadeus = None
 
+# Optional shared cache tier, so Amadeus results are reused across workers and restarts.
+# Timeouts are short so an unresponsive Redis degrades to a cache miss, not a stall.
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_TIMEOUT_SECONDS = float(os.getenv("REDIS_TIMEOUT_SECONDS", "0.25"))
+redis_client: Optional[aioredis.Redis] = (
+    aioredis.from_url(
+        REDIS_URL,
+        socket_timeout=REDIS_TIMEOUT_SECONDS,
+        socket_connect_timeout=REDIS_TIMEOUT_SECONDS,
+    )
+    if REDIS_URL
+    else None
+)
+
 # Initialize MCP Server
 mcp_server = Server("trip-canvas")
 
 
-class Money(BaseModel):
+class FrozenModel(BaseModel):
+    """Base for API models: instances are immutable, so they can be cached and shared."""
+
+    model_config = ConfigDict(frozen=True)
+
+
+class Money(FrozenModel):
     amount: float
     currency: str = Field(min_length=3, max_length=3)
 
 
-class DateRange(BaseModel):
+class DateRange(FrozenModel):
     start_date: str
     end_date: str
 
 
-class Traveler(BaseModel):
+class Traveler(FrozenModel):
     adults: int = Field(ge=1)
     children_ages: List[int] = Field(default_factory=list)
 
 
-class LocationModel(BaseModel):
+class LocationModel(FrozenModel):
     iata: Optional[str] = Field(default=None, min_length=3, max_length=3)
     city: Optional[str] = None
     country: Optional[str] = None
@@ -59,7 +107,7 @@ class LocationModel(BaseModel):
     lng: Optional[float] = None
 
 
-class TripPreferences(BaseModel):
+class TripPreferences(FrozenModel):
     cabin_class: Optional[Literal["economy", "premium_economy", "business", "first"]] = None
     hotel_stars_min: Optional[int] = Field(default=None, ge=1, le=5)
     max_stops: Optional[int] = Field(default=None, ge=0, le=3)
@@ -67,7 +115,7 @@ class TripPreferences(BaseModel):
     activity_categories: List[str] = Field(default_factory=list)
 
 
-class TripRequest(BaseModel):
+class TripRequest(FrozenModel):
     origin: LocationModel
     destination: LocationModel
     dates: DateRange
@@ -76,7 +124,7 @@ class TripRequest(BaseModel):
     preferences: Optional[TripPreferences] = None
 
 
-class Segment(BaseModel):
+class Segment(FrozenModel):
     from_: str = Field(alias="from")
     to: str
     depart_at: str
@@ -85,7 +133,7 @@ class Segment(BaseModel):
     flight_number: Optional[str] = None
 
 
-class FlightOffer(BaseModel):
+class FlightOffer(FrozenModel):
     id: str
     provider: Literal["amadeus", "duffel", "skyscanner"]
     total_price: Money
@@ -98,13 +146,13 @@ class FlightOffer(BaseModel):
     score: float
 
 
-class HotelLocation(BaseModel):
+class HotelLocation(FrozenModel):
     lat: Optional[float] = None
     lng: Optional[float] = None
     area: Optional[str] = None
 
 
-class HotelOffer(BaseModel):
+class HotelOffer(FrozenModel):
     id: str
     provider: Literal["expedia_rapid", "booking_demand"]
     hotel_name: str
@@ -119,7 +167,7 @@ class HotelOffer(BaseModel):
     score: float
 
 
-class ActivityOffer(BaseModel):
+class ActivityOffer(FrozenModel):
     id: str
     provider: Literal["viator"]
     title: str
@@ -133,7 +181,7 @@ class ActivityOffer(BaseModel):
     score: float
 
 
-class SearchResponse(BaseModel):
+class SearchResponse(FrozenModel):
     request_id: str
     freshness_ts: str
     flights: List[FlightOffer] = Field(default_factory=list)
@@ -142,7 +190,7 @@ class SearchResponse(BaseModel):
     warnings: List[str] = Field(default_factory=list)
 
 
-class RefineFilters(BaseModel):
+class RefineFilters(FrozenModel):
     max_price: Optional[Money] = None
     airline_whitelist: List[str] = Field(default_factory=list)
     hotel_stars_min: Optional[int] = None
@@ -150,23 +198,23 @@ class RefineFilters(BaseModel):
     activity_categories: List[str] = Field(default_factory=list)
 
 
-class RefineRequest(BaseModel):
+class RefineRequest(FrozenModel):
     request_id: str
     filters: RefineFilters = Field(default_factory=RefineFilters)
 
 
-class TravelerContact(BaseModel):
+class TravelerContact(FrozenModel):
     email: Optional[str] = None
     phone: Optional[str] = None
 
 
-class StartBookingRequest(BaseModel):
+class StartBookingRequest(FrozenModel):
     offer_type: Literal["flight", "hotel", "activity"]
     offer_id: str
     traveler_contact: Optional[TravelerContact] = None
 
 
-class StartBookingResponse(BaseModel):
+class StartBookingResponse(FrozenModel):
     status: Literal["ready", "requires_input", "failed"]
     booking_mode: Literal["redirect", "api_order"]
     booking_url: Optional[str] = None
@@ -174,7 +222,7 @@ class StartBookingResponse(BaseModel):
     missing_fields: List[str] = Field(default_factory=list)
 
 
-class ItineraryItem(BaseModel):
+class ItineraryItem(FrozenModel):
     type: Literal["flight", "hotel", "activity", "poi"]
     offer_id: str
     day: int = Field(ge=1)
@@ -183,14 +231,247 @@ class ItineraryItem(BaseModel):
     notes: Optional[str] = None
 
 
-class SaveItineraryRequest(BaseModel):
+class SaveItineraryRequest(FrozenModel):
     trip_request: TripRequest
     items: List[ItineraryItem]
 
 
-class SaveItineraryResponse(BaseModel):
+class SaveItineraryResponse(FrozenModel):
     itinerary_id: str
 
+# The Amadeus SDK is synchronous, so every call runs in a worker thread. A per-endpoint
+# semaphore caps how many of one endpoint's calls are in flight, so a slow endpoint
+# can't occupy every thread in the pool; request rate is paced by the token bucket below.
+AMADEUS_MAX_CONCURRENCY = 4
+_amadeus_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+# Dedicated, bounded pool for Amadeus calls, owned by the app lifespan. Outside the
+# lifespan (e.g. test_mcp.py) calls fall back to the default executor.
+AMADEUS_MAX_WORKERS = 8
+_amadeus_executor: Optional[ThreadPoolExecutor] = None
+
+
+class TokenBucket:
+    """Async token bucket: allows `rate` acquisitions per second, with bursts up to `burst`.
+
+    The capacity is at least one token, so fractional rates (e.g. 0.5/s) still admit
+    calls, and the default burst of 1 spaces calls evenly at 1/rate seconds. Callers
+    reserve a token up front (the balance may go negative) and sleep off the debt, so
+    waiters keep FIFO order without holding a lock across the sleep.
+    """
+
+    def __init__(self, rate: float, burst: float = 1) -> None:
+        if rate <= 0:
+            raise ValueError(f"TokenBucket rate must be positive, got {rate}")
+        self._rate = rate
+        self._capacity = max(1.0, burst)
+        self._tokens = self._capacity
+        self._updated: Optional[float] = None
+
+    async def acquire(self) -> None:
+        now = asyncio.get_running_loop().time()
+        if self._updated is not None:
+            self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self._rate)
+
+
+# Client-side pacing across all endpoints, so bursts queue here instead of tripping
+# Amadeus 429s (test environment: 10 req/s). The bucket is per process, so by default
+# the 10 req/s is split across WEB_CONCURRENCY workers. Set AMADEUS_RATE_LIMIT=0 to disable.
+AMADEUS_RATE_LIMIT = float(
+    os.getenv("AMADEUS_RATE_LIMIT", str(10 / max(1, int(os.getenv("WEB_CONCURRENCY", "1")))))
+)
+AMADEUS_RATE_BURST = float(os.getenv("AMADEUS_RATE_BURST", "1"))
+AMADEUS_MAX_RETRIES = 2
+_amadeus_rate_limiter: Optional[TokenBucket] = (
+    TokenBucket(AMADEUS_RATE_LIMIT, AMADEUS_RATE_BURST) if AMADEUS_RATE_LIMIT > 0 else None
+)
+
+
+def _is_rate_limited(error: ResponseError) -> bool:
+    return getattr(error.response, "status_code", None) == 429
+
+
+async def _amadeus_get(endpoint: str, fn: Callable[..., Any], **params: Any) -> Any:
+    """Run a blocking Amadeus SDK call without blocking the event loop."""
+    semaphore = _amadeus_semaphores.get(endpoint)
+    if semaphore is None:
+        semaphore = _amadeus_semaphores[endpoint] = asyncio.Semaphore(AMADEUS_MAX_CONCURRENCY)
+    async with semaphore:
+        for attempt in range(AMADEUS_MAX_RETRIES + 1):
+            if _amadeus_rate_limiter is not None:
+                await _amadeus_rate_limiter.acquire()
+            try:
+                if _amadeus_executor is None:
+                    return await asyncio.to_thread(fn, **params)
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(_amadeus_executor, partial(fn, **params))
+            except ResponseError as error:
+                if not _is_rate_limited(error) or attempt == AMADEUS_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(0.5 * 2**attempt)
+
+
+class ResponseCache:
+    """TTL cache for Amadeus lookups where concurrent misses on a key share one upstream call.
+
+    With a namespace, misses fall through to Redis (when REDIS_URL is set) before Amadeus,
+    and fresh results are written back there for shared_ttl seconds. With serve_stale, the
+    last good value for a key outlives the TTL and is returned if a refresh fails with an
+    Amadeus ResponseError.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        namespace: Optional[str] = None,
+        shared_ttl: Optional[int] = None,
+        serve_stale: bool = False,
+    ) -> None:
+        self._entries: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._namespace = namespace
+        self._shared_ttl = shared_ttl or int(ttl)
+        self._stale: Optional[LRUCache] = LRUCache(maxsize=maxsize) if serve_stale else None
+
+    def _remember(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        if self._stale is not None:
+            self._stale[key] = value
+
+    def _shared_key(self, key: Hashable) -> str:
+        parts = key if isinstance(key, tuple) else (key,)
+        return ":".join((self._namespace, *map(str, parts)))
+
+    async def _shared_get(self, key: Hashable) -> Any:
+        if redis_client is None or self._namespace is None:
+            return None
+        try:
+            raw = await redis_client.get(self._shared_key(key))
+        except RedisError as error:
+            logger.warning("Redis read failed (%s): %s", self._namespace, error)
+            return None
+        return orjson.loads(raw) if raw is not None else None
+
+    async def _shared_set(self, key: Hashable, value: Any) -> None:
+        if redis_client is None or self._namespace is None:
+            return
+        try:
+            await redis_client.set(self._shared_key(key), orjson.dumps(value), ex=self._shared_ttl)
+        except RedisError as error:
+            logger.warning("Redis write failed (%s): %s", self._namespace, error)
+
+    async def _load(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        cached = await self._shared_get(key)
+        if cached:
+            self._remember(key, cached)
+            return cached
+        try:
+            value = await fetch()
+        except ResponseError as error:
+            stale = self._stale.get(key) if self._stale is not None else None
+            if stale is None:
+                raise
+            logger.warning("Amadeus Error (%s), serving stale result: %s", self._namespace, error)
+            return stale
+        # Empty results usually mean an upstream error; don't pin them for the TTL.
+        if value:
+            self._remember(key, value)
+            await self._shared_set(key, value)
+        return value
+
+    def _forget(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark a failure as retrieved even if every caller was cancelled meanwhile.
+        if not task.cancelled():
+            task.exception()
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self._entries.get(key)
+        if cached is not None:
+            return cached
+        # Concurrent misses await one shared task, so every caller gets the same result
+        # (or error) from a single upstream call. The task is shielded: a cancelled
+        # caller doesn't cancel the lookup others are still waiting on.
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._load(key, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(partial(self._forget, key))
+        return await asyncio.shield(task)
+
+
+# City coordinates and IATA codes are effectively static, so locations are kept for a
+# day; offers are priced live, so they expire quickly in-process. The Redis tier holds
+# hotel, activity and flight offers a little longer to spare supplier quota across
+# workers. Everything but flight fares may be served stale while Amadeus is failing.
+_location_cache = ResponseCache(maxsize=4096, ttl=86400, namespace="location", serve_stale=True)
+_hotel_cache = ResponseCache(
+    maxsize=512, ttl=120, namespace="hotels", shared_ttl=1800, serve_stale=True
+)
+_activity_cache = ResponseCache(
+    maxsize=512, ttl=120, namespace="activities", shared_ttl=3600, serve_stale=True
+)
+_flight_cache = ResponseCache(maxsize=512, ttl=120, namespace="flights", shared_ttl=600)
+
+
+# Placeholder times used when Amadeus omits segment timestamps.
+DEFAULT_DEPART_TIME = "T09:00:00"
+DEFAULT_ARRIVE_TIME = "T12:00:00"
+DEFAULT_HOTEL_IMAGE = "https://images.unsplash.com/photo-1566073771259-6a8506099945?auto=format&fit=crop&w=400"
+
+# Bound str.format for hotel card prices, so each card is one call.
+_format_nightly_price: Callable[[float], str] = "${:.0f}/night".format
+
+# Warnings surfaced in SearchResponse.warnings.
+NO_FLIGHTS_WARNING = "No live flight offers were returned from Amadeus for this query."
+NO_HOTELS_WARNING = "No live hotel offers were returned from Amadeus for this query."
+NO_ACTIVITIES_WARNING = "No live activities were returned from Amadeus for this query."
+UNKNOWN_REQUEST_WARNING = "Unknown request_id. Run /v1/search_travel first."
+
+@dataclass(frozen=True, slots=True)
+class CityRecord:
+    iata: str
+    lat: float
+    lng: float
+
+
+# Popular destinations resolved without an Amadeus round-trip, keyed by casefolded name.
+CITY_INDEX: Dict[str, CityRecord] = {
+    name.casefold(): CityRecord(iata=iata, lat=lat, lng=lng)
+    for name, iata, lat, lng in (
+        ("Paris", "PAR", 48.8566, 2.3522),
+        ("London", "LON", 51.5074, -0.1278),
+        ("New York", "NYC", 40.7128, -74.0060),
+        ("Rome", "ROM", 41.9028, 12.4964),
+        ("Barcelona", "BCN", 41.3874, 2.1686),
+        ("Amsterdam", "AMS", 52.3676, 4.9041),
+        ("Berlin", "BER", 52.5200, 13.4050),
+        ("Madrid", "MAD", 40.4168, -3.7038),
+        ("Tokyo", "TYO", 35.6762, 139.6503),
+        ("Dubai", "DXB", 25.2048, 55.2708),
+        ("Singapore", "SIN", 1.3521, 103.8198),
+        ("Lisbon", "LIS", 38.7223, -9.1393),
+    )
+}
+
+
+def _dig(data: Any, *keys: str, default: Any = None) -> Any:
+    """Walk nested provider dicts, returning default at the first missing or non-dict level."""
+    for key in keys:
+        if not isinstance(data, dict):
+            return default
+        data = data.get(key)
+        if data is None:
+            return default
+    return data
+
+
 def _as_float(value: Any, fallback: float = 0.0) -> float:
     try:
         return float(value)
@@ -198,169 +479,214 @@ def _as_float(value: Any, fallback: float = 0.0) -> float:
         return fallback
 
 
-async def get_hotels(city_code: str, check_in_date: str, check_out_date: str, adults: int = 1):
+async def _fetch_hotels(city_code: str, check_in_date: str, check_out_date: str, adults: int = 1):
     """Fetch hotel offers from Amadeus API."""
-    if not amadeus:
-        return []
-    try:
-        response = amadeus.shopping.hotel_offers_search.get(
-            cityCode=city_code,
-            checkInDate=check_in_date,
-            checkOutDate=check_out_date,
-            adults=max(1, adults),
-            roomQuantity=1,
-            bestRateOnly=True,
-            view="FULL",
+    response = await _amadeus_get(
+        "hotels",
+        amadeus.shopping.hotel_offers_search.get,
+        cityCode=city_code,
+        checkInDate=check_in_date,
+        checkOutDate=check_out_date,
+        adults=max(1, adults),
+        roomQuantity=1,
+        bestRateOnly=True,
+        view="FULL",
+    )
+    to_float = _as_float  # bound locally for the per-offer loop
+    offers = []
+    for hotel_offer in response.data[:5]:
+        hotel_info = hotel_offer.get("hotel", {})
+        offer_list = hotel_offer.get("offers", [])
+        best_offer = offer_list[0] if offer_list else {}
+        price_info = best_offer.get("price", {})
+        total = to_float(price_info.get("total"))
+        currency = (price_info.get("currency") or "USD").upper()
+        nightly = to_float(_dig(price_info, "variations", "average", "base"))
+
+        offers.append(
+            {
+                "name": hotel_info.get("name") or "Unknown Hotel",
+                "total_amount": total,
+                "nightly_amount": nightly if nightly > 0 else None,
+                "currency": currency,
+                "rating": to_float(hotel_info.get("rating")),
+                "latitude": hotel_info.get("latitude"),
+                "longitude": hotel_info.get("longitude"),
+                "amenities": hotel_info.get("amenities", [])[:8],
+                "cancellation": _dig(best_offer, "policies", "cancellation", "description", "text"),
+                "booking_url": best_offer.get("self"),
+            }
         )
-        offers = []
-        for hotel_offer in response.data[:5]:
-            hotel_info = hotel_offer.get("hotel", {})
-            offer_list = hotel_offer.get("offers", [])
-            best_offer = offer_list[0] if offer_list else {}
-            price_info = best_offer.get("price", {})
-            avg_price_info = price_info.get("variations", {}).get("average", {})
-            total = _as_float(price_info.get("total"))
-            currency = (price_info.get("currency") or "USD").upper()
-            nightly = _as_float(avg_price_info.get("base"), fallback=0.0)
-
-            offers.append(
+    return offers
+
+async def _fetch_activities(latitude: float, longitude: float):
+    """Fetch tours and activities from Amadeus API."""
+    response = await _amadeus_get(
+        "activities",
+        amadeus.shopping.activities.get,
+        latitude=latitude,
+        longitude=longitude,
+    )
+    to_float = _as_float  # bound locally for the per-activity loop
+    activities = []
+    for activity in response.data[:8]:
+        price_info = activity.get("price", {})
+        geo_code = activity.get("geoCode", {})
+        booking_link = (
+            activity.get("bookingLink")
+            or _dig(activity, "self", "href")
+            or activity.get("self")
+        )
+        activities.append(
+            {
+                "title": activity.get("name") or "Local activity",
+                "amount": to_float(price_info.get("amount")),
+                "currency": (price_info.get("currencyCode") or "USD").upper(),
+                "booking_url": booking_link,
+                "rating": to_float(activity.get("rating")),
+                "description": activity.get("shortDescription"),
+                "latitude": geo_code.get("latitude"),
+                "longitude": geo_code.get("longitude"),
+            }
+        )
+    return activities
+
+async def _fetch_location(keyword: str):
+    """Search for a location (city/airport) to get coordinates and IATA code."""
+    response = await _amadeus_get(
+        "locations",
+        amadeus.reference_data.locations.get,
+        keyword=keyword,
+        subType=Location.CITY
+    )
+    if response.data:
+        location = response.data[0]
+        return {
+            "name": location.get('name'),
+            "iataCode": location.get('iataCode'),
+            "latitude": _dig(location, 'geoCode', 'latitude'),
+            "longitude": _dig(location, 'geoCode', 'longitude')
+        }
+    return None
+
+async def _fetch_flight_offers(origin: str, destination: str, departure_date: str):
+    """Search for flight offers."""
+    response = await _amadeus_get(
+        "flights",
+        amadeus.shopping.flight_offers_search.get,
+        originLocationCode=origin,
+        destinationLocationCode=destination,
+        departureDate=departure_date,
+        adults=1
+    )
+    # Defaults depend only on the query, so build them once rather than per segment.
+    default_depart_at = f"{departure_date}{DEFAULT_DEPART_TIME}"
+    default_arrive_at = f"{departure_date}{DEFAULT_ARRIVE_TIME}"
+    placeholder_segment = {
+        "from": origin,
+        "to": destination,
+        "depart_at": default_depart_at,
+        "arrive_at": default_arrive_at,
+        "carrier": "Unknown",
+        "flight_number": None,
+    }
+    offers = []
+    for offer in response.data[:3]:
+        price_info = offer.get("price", {})
+        itineraries = offer.get("itineraries", [])
+        first_itinerary = itineraries[0] if itineraries else {}
+        raw_segments = first_itinerary.get("segments", [])
+        segments = []
+        for segment in raw_segments:
+            dep = segment.get("departure", {})
+            arr = segment.get("arrival", {})
+            segments.append(
                 {
-                    "name": hotel_info.get("name") or "Unknown Hotel",
-                    "total_amount": total,
-                    "nightly_amount": nightly if nightly > 0 else None,
-                    "currency": currency,
-                    "rating": _as_float(hotel_info.get("rating"), fallback=0.0),
-                    "latitude": hotel_info.get("latitude"),
-                    "longitude": hotel_info.get("longitude"),
-                    "amenities": hotel_info.get("amenities", [])[:8],
-                    "cancellation": (best_offer.get("policies", {}).get("cancellation", {}).get("description", {}).get("text")),
-                    "booking_url": best_offer.get("self"),
+                    "from": dep.get("iataCode", origin),
+                    "to": arr.get("iataCode", destination),
+                    "depart_at": dep.get("at", default_depart_at),
+                    "arrive_at": arr.get("at", default_arrive_at),
+                    "carrier": segment.get("carrierCode", "Unknown"),
+                    "flight_number": segment.get("number"),
                 }
             )
-        return offers
+
+        if not segments:
+            segments = [placeholder_segment]
+
+        offers.append(
+            {
+                "price_total": _as_float(price_info.get("total")),
+                "currency": (price_info.get("currency") or "USD").upper(),
+                "segments": segments,
+                "refundable": _dig(offer, "pricingOptions", "refundableFare"),
+                "fare_rules_summary": "Live fare from Amadeus",
+            }
+        )
+    return offers
+
+
+async def get_hotels(city_code: str, check_in_date: str, check_out_date: str, adults: int = 1):
+    """Fetch hotel offers from Amadeus API, reusing recent identical queries."""
+    if not amadeus:
+        return []
+    key = (city_code.upper(), check_in_date, check_out_date, max(1, adults))
+    try:
+        return await _hotel_cache.get_or_fetch(
+            key, lambda: _fetch_hotels(city_code, check_in_date, check_out_date, adults)
+        )
     except ResponseError as error:
-        print(f"Amadeus Error (Hotels): {error}")
+        logger.warning("Amadeus Error (Hotels): %s", error)
         return []
 
+
 async def get_activities(latitude: float, longitude: float):
-    """Fetch tours and activities from Amadeus API."""
+    """Fetch tours and activities from Amadeus API, reusing recent identical queries."""
     if not amadeus:
         return []
+    key = (round(float(latitude), 4), round(float(longitude), 4))
     try:
-        response = amadeus.shopping.activities.get(latitude=latitude, longitude=longitude)
-        activities = []
-        for activity in response.data[:8]:
-            price_info = activity.get("price", {})
-            geo_code = activity.get("geoCode", {})
-            booking_link = (
-                activity.get("bookingLink")
-                or activity.get("self", {}).get("href")
-                or activity.get("self")
-            )
-            activities.append(
-                {
-                    "title": activity.get("name") or "Local activity",
-                    "amount": _as_float(price_info.get("amount"), fallback=0.0),
-                    "currency": (price_info.get("currencyCode") or "USD").upper(),
-                    "booking_url": booking_link,
-                    "rating": _as_float(activity.get("rating"), fallback=0.0),
-                    "description": activity.get("shortDescription"),
-                    "latitude": geo_code.get("latitude"),
-                    "longitude": geo_code.get("longitude"),
-                }
-            )
-        return activities
+        return await _activity_cache.get_or_fetch(key, lambda: _fetch_activities(latitude, longitude))
     except ResponseError as error:
-        print(f"Amadeus Error (Activities): {error}")
+        logger.warning("Amadeus Error (Activities): %s", error)
         return []
 
+
 async def get_location(keyword: str):
-    """Search for a location (city/airport) to get coordinates and IATA code."""
+    """Resolve a city to coordinates and IATA code, reusing recent identical lookups."""
     if not amadeus:
         return None
+    key = keyword.strip().casefold()
     try:
-        response = amadeus.reference_data.locations.get(
-            keyword=keyword,
-            subType=Location.CITY
-        )
-        if response.data:
-            location = response.data[0]
-            return {
-                "name": location.get('name'),
-                "iataCode": location.get('iataCode'),
-                "latitude": location.get('geoCode', {}).get('latitude'),
-                "longitude": location.get('geoCode', {}).get('longitude')
-            }
-        return None
+        return await _location_cache.get_or_fetch(key, lambda: _fetch_location(keyword))
     except ResponseError as error:
-        print(f"Amadeus Error (Location): {error}")
+        logger.warning("Amadeus Error (Location): %s", error)
         return None
 
+
 async def search_flight_offers(origin: str, destination: str, departure_date: str):
-    """Search for flight offers."""
+    """Search for flight offers, reusing recent identical queries."""
     if not amadeus:
         return []
+    key = (origin.upper(), destination.upper(), departure_date)
     try:
-        response = amadeus.shopping.flight_offers_search.get(
-            originLocationCode=origin,
-            destinationLocationCode=destination,
-            departureDate=departure_date,
-            adults=1
+        return await _flight_cache.get_or_fetch(
+            key, lambda: _fetch_flight_offers(origin, destination, departure_date)
         )
-        offers = []
-        for offer in response.data[:3]:
-            price_info = offer.get("price", {})
-            itineraries = offer.get("itineraries", [])
-            first_itinerary = itineraries[0] if itineraries else {}
-            raw_segments = first_itinerary.get("segments", [])
-            segments = []
-            for segment in raw_segments:
-                dep = segment.get("departure", {})
-                arr = segment.get("arrival", {})
-                segments.append(
-                    {
-                        "from": dep.get("iataCode", origin),
-                        "to": arr.get("iataCode", destination),
-                        "depart_at": dep.get("at", f"{departure_date}T09:00:00"),
-                        "arrive_at": arr.get("at", f"{departure_date}T12:00:00"),
-                        "carrier": segment.get("carrierCode", "Unknown"),
-                        "flight_number": segment.get("number"),
-                    }
-                )
-
-            if not segments:
-                segments = [
-                    {
-                        "from": origin,
-                        "to": destination,
-                        "depart_at": f"{departure_date}T09:00:00",
-                        "arrive_at": f"{departure_date}T12:00:00",
-                        "carrier": "Unknown",
-                        "flight_number": None,
-                    }
-                ]
-
-            offers.append(
-                {
-                    "price_total": _as_float(price_info.get("total"), fallback=0.0),
-                    "currency": (price_info.get("currency") or "USD").upper(),
-                    "segments": segments,
-                    "refundable": offer.get("pricingOptions", {}).get("refundableFare"),
-                    "fare_rules_summary": "Live fare from Amadeus",
-                }
-            )
-        return offers
     except ResponseError as error:
-        print(f"Amadeus Error (Flights): {error}")
+        logger.warning("Amadeus Error (Flights): %s", error)
         return []
 
 
 def utc_now_iso() -> str:
     return datetime.now(timezone.utc).isoformat()
 
-# Serve raw widget files
-WIDGET_DIR = Path(__file__).parent.parent / "widget"
-WELL_KNOWN_DIR = Path(__file__).parent / ".well-known"
+# Serve raw widget files. Paths are resolved once; the widget ships with the deploy,
+# so build_widget_html reads the file without a separate exists() check.
+SERVER_DIR = Path(__file__).parent
+WIDGET_DIR = SERVER_DIR.parent / "widget"
+WIDGET_INDEX_PATH = WIDGET_DIR / "index.html"
+WELL_KNOWN_DIR = SERVER_DIR / ".well-known"
 
 
 @dataclass
@@ -369,19 +695,21 @@ class ResourceReadResult:
     mime_type: str | None = None
     meta: dict[str, Any] | None = None
 
+# Public base URL of this deployment, read once; empty when unset.
+APP_HOST = os.getenv("APP_HOST", "").rstrip("/")
+APP_HOST_IS_URL = APP_HOST.startswith(("http://", "https://"))
+
+
 def build_widget_html() -> str:
     """Load widget HTML and rewrite asset URLs to an absolute APP_HOST when configured."""
-    index_html_path = WIDGET_DIR / "index.html"
-    html = index_html_path.read_text(encoding="utf-8")
-    host = os.getenv("APP_HOST", "").rstrip("/")
-    html = html.replace("__WIDGET_HOST__", host)
-    return html
+    # Substitute on the raw bytes and decode once; MCP text resources must be str.
+    html = WIDGET_INDEX_PATH.read_bytes().replace(b"__WIDGET_HOST__", APP_HOST.encode("utf-8"))
+    return html.decode("utf-8")
 
 def build_widget_meta() -> dict:
-    host = os.getenv("APP_HOST", "").rstrip("/")
     resource_domains = []
-    if host.startswith("http://") or host.startswith("https://"):
-        resource_domains.append(host)
+    if APP_HOST_IS_URL:
+        resource_domains.append(APP_HOST)
     # Hotel images use Unsplash URLs.
     resource_domains.append("https://images.unsplash.com")
     # Add additional image and media domains for robust image rendering
@@ -399,239 +727,326 @@ def build_widget_meta() -> dict:
             "object_src": ["none"],
         },
     }
-    if host.startswith("http://") or host.startswith("https://"):
-        meta["openai/widgetDomain"] = host
+    if APP_HOST_IS_URL:
+        meta["openai/widgetDomain"] = APP_HOST
     return meta
 
-@mcp_server.list_resources()
-async def list_resources() -> List[types.Resource]:
+
+# Widget HTML and metadata are immutable for the process lifetime, so they are built
+# once (at startup or on first use) and served from memory. Set WIDGET_HOT_RELOAD=1
+# during widget development to rebuild them on every request instead.
+WIDGET_HOT_RELOAD = os.getenv("WIDGET_HOT_RELOAD") == "1"
+_WIDGET_HTML_CACHE: Optional[str] = None
+_WIDGET_HTML_BYTES_CACHE: Optional[bytes] = None
+_WIDGET_META_CACHE: Optional[dict] = None
+
+
+def get_widget_html() -> str:
+    global _WIDGET_HTML_CACHE
+    if WIDGET_HOT_RELOAD:
+        return build_widget_html()
+    if _WIDGET_HTML_CACHE is None:
+        _WIDGET_HTML_CACHE = build_widget_html()
+    return _WIDGET_HTML_CACHE
+
+
+def get_widget_html_bytes() -> bytes:
+    """The rewritten widget HTML, pre-encoded for HTTP responses."""
+    global _WIDGET_HTML_BYTES_CACHE
+    if WIDGET_HOT_RELOAD:
+        return build_widget_html().encode("utf-8")
+    if _WIDGET_HTML_BYTES_CACHE is None:
+        _WIDGET_HTML_BYTES_CACHE = get_widget_html().encode("utf-8")
+    return _WIDGET_HTML_BYTES_CACHE
+
+
+def get_widget_meta() -> dict:
+    global _WIDGET_META_CACHE
+    if WIDGET_HOT_RELOAD:
+        return build_widget_meta()
+    if _WIDGET_META_CACHE is None:
+        _WIDGET_META_CACHE = build_widget_meta()
+    return _WIDGET_META_CACHE
+
+def _build_resources() -> List[types.Resource]:
     return [
         types.Resource(
             uri="ui://widget/trip-plan.html",
             name="Trip Plan Widget",
             mimeType="text/html+skybridge",
             description="The interactive UI for the travel planner",
-            _meta=build_widget_meta()
+            _meta=get_widget_meta()
         )
     ]
 
+
+# Resource and tool listings are static, so MCP handshakes return prebuilt lists.
+_RESOURCES = _build_resources()
+
+
+@mcp_server.list_resources()
+async def list_resources() -> List[types.Resource]:
+    return _build_resources() if WIDGET_HOT_RELOAD else _RESOURCES
+
 @mcp_server.read_resource()
 async def read_resource(uri: str) -> types.TextResourceContents | types.BlobResourceContents:
+    logger.debug("read_resource uri=%s", uri)
     if str(uri) == "ui://widget/trip-plan.html":
-        html = build_widget_html()
+        html = get_widget_html()
         return [
             ResourceReadResult(
                 content=html,
                 mime_type="text/html+skybridge",
-                meta=build_widget_meta(),
+                meta=get_widget_meta(),
             )
         ]
     raise ValueError(f"Resource not found: {uri}")
 
+_PLAN_TRIP_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "destination": {"type": "string", "description": "The city name (e.g., 'Paris', 'New York')"},
+        "origin": {"type": "string", "description": "The origin city IATA code (e.g., 'LON')", "default": "LON"},
+        "departure_date": {"type": "string", "description": "Departure date in YYYY-MM-DD format"},
+        "days": {"type": "integer", "description": "Number of days for the trip", "default": 3},
+    },
+    "required": ["destination"],
+}
+
+_SEARCH_FLIGHTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "origin": {"type": "string", "description": "Origin IATA code (e.g., LHR)"},
+        "destination": {"type": "string", "description": "Destination IATA code (e.g., JFK)"},
+        "departure_date": {"type": "string", "description": "Departure date in YYYY-MM-DD format"},
+    },
+    "required": ["origin", "destination", "departure_date"],
+}
+
+_SEARCH_ACTIVITIES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "keyword": {"type": "string", "description": "City name to search for activities"},
+    },
+    "required": ["keyword"],
+}
+
+_PLAN_TRIP_META = {
+    "openai/outputTemplate": "ui://widget/trip-plan.html",
+    "openai/widgetAccessible": True,
+    "openai/widgetHasImages": True,  # Enable image rendering
+    "openai/widgetCSP": {
+        "img_src": ["self", "https:", "data:"],
+        "resource_domains": ["https://images.unsplash.com"],
+    },
+}
+
+_TOOL_ANNOTATIONS = {
+    "destructiveHint": False,
+    "openWorldHint": True,
+    "readOnlyHint": False,
+}
+
+_TOOLS: List[types.Tool] = [
+    types.Tool(
+        name="plan_trip",
+        description="Plans a comprehensive travel itinerary including flights, hotels and activities using Amadeus.",
+        inputSchema=_PLAN_TRIP_SCHEMA,
+        _meta=_PLAN_TRIP_META,
+        annotations=_TOOL_ANNOTATIONS,
+    ),
+    types.Tool(
+        name="search_flights",
+        description="Search for flight offers between two cities.",
+        inputSchema=_SEARCH_FLIGHTS_SCHEMA,
+        annotations=_TOOL_ANNOTATIONS,
+    ),
+    types.Tool(
+        name="search_activities",
+        description="Find tours and activities at a destination.",
+        inputSchema=_SEARCH_ACTIVITIES_SCHEMA,
+        annotations=_TOOL_ANNOTATIONS,
+    )
+]
+
+
 @mcp_server.list_tools()
 async def list_tools() -> List[types.Tool]:
-    return [
-        types.Tool(
-            name="plan_trip",
-            description="Plans a comprehensive travel itinerary including flights, hotels and activities using Amadeus.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "destination": {"type": "string", "description": "The city name (e.g., 'Paris', 'New York')"},
-                    "origin": {"type": "string", "description": "The origin city IATA code (e.g., 'LON')", "default": "LON"},
-                    "departure_date": {"type": "string", "description": "Departure date in YYYY-MM-DD format"},
-                    "days": {"type": "integer", "description": "Number of days for the trip", "default": 3},
-                },
-                "required": ["destination"],
-            },
-            _meta={
-                "openai/outputTemplate": "ui://widget/trip-plan.html",
-                "openai/widgetAccessible": True,
-                "openai/widgetHasImages": True,  # Enable image rendering
-                "openai/widgetCSP": {
-                    "img_src": ["self", "https:", "data:"],
-                    "resource_domains": ["https://images.unsplash.com"],
-                },
-            },
-            annotations={
-                "destructiveHint": False,
-                "openWorldHint": True,
-                "readOnlyHint": False,
-            }
-        ),
-        types.Tool(
-            name="search_flights",
-            description="Search for flight offers between two cities.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "origin": {"type": "string", "description": "Origin IATA code (e.g., LHR)"},
-                    "destination": {"type": "string", "description": "Destination IATA code (e.g., JFK)"},
-                    "departure_date": {"type": "string", "description": "Departure date in YYYY-MM-DD format"},
-                },
-                "required": ["origin", "destination", "departure_date"],
-            },
-            annotations={
-                "destructiveHint": False,
-                "openWorldHint": True,
-                "readOnlyHint": False,
-            }
-        ),
-        types.Tool(
-            name="search_activities",
-            description="Find tours and activities at a destination.",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "keyword": {"type": "string", "description": "City name to search for activities"},
-                },
-                "required": ["keyword"],
-            },
-            annotations={
-                "destructiveHint": False,
-                "openWorldHint": True,
-                "readOnlyHint": False,
-            }
-        )
-    ]
+    return _TOOLS
+
+# Widget payload rows for plan_trip's structuredContent. Slotted dataclasses are smaller
+# than per-row dicts, and Pydantic serializes them to the same JSON objects.
+@dataclass(slots=True, frozen=True)
+class HotelCard:
+    name: str
+    image: str
+    price: str
+    rating: str
+
+
+@dataclass(slots=True, frozen=True)
+class ItineraryDay:
+    day: int
+    activities: List[str]
+
+
+async def _handle_search_flights(arguments: dict) -> types.CallToolResult:
+    origin = (arguments.get("origin") or "LON").upper()
+    destination = (arguments.get("destination") or "PAR").upper()
+    departure_date = arguments.get("departure_date") or default_departure_date()
+    request = build_trip_request(
+        origin_iata=origin,
+        destination_city=destination,
+        destination_iata=destination,
+        departure_date=departure_date,
+        days=1,
+    )
+    search_response = await _search_travel(request)
+    offers = []
+    for offer in search_response.flights:
+        segment = offer.segments[0] if offer.segments else None
+        route = f"{segment.from_}->{segment.to}" if segment else f"{origin}->{destination}"
+        price = f"{offer.total_price.amount:.2f} {offer.total_price.currency}"
+        details = offer.fare_rules_summary or "Live fare details unavailable."
+        offers.append(f"{route} | {price} | {details}")
+    offers_text = "\n".join(offers) if offers else "No flights found."
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=f"Found flights:\n{offers_text}")]
+    )
 
-@mcp_server.call_tool()
-async def call_tool(name: str, arguments: dict) -> types.CallToolResult:
-    if name == "search_flights":
-        origin = (arguments.get("origin") or "LON").upper()
-        destination = (arguments.get("destination") or "PAR").upper()
-        departure_date = arguments.get("departure_date") or default_departure_date()
-        request = build_trip_request(
-            origin_iata=origin,
-            destination_city=destination,
-            destination_iata=destination,
-            departure_date=departure_date,
-            days=1,
-        )
-        search_response = await search_travel(request)
-        offers = []
-        for offer in search_response.flights:
-            segment = offer.segments[0] if offer.segments else None
-            route = f"{segment.from_}->{segment.to}" if segment else f"{origin}->{destination}"
-            price = f"{offer.total_price.amount:.2f} {offer.total_price.currency}"
-            details = offer.fare_rules_summary or "Live fare details unavailable."
-            offers.append(f"{route} | {price} | {details}")
-        offers_text = "\n".join(offers) if offers else "No flights found."
-        return types.CallToolResult(
-            content=[types.TextContent(type="text", text=f"Found flights:\n{offers_text}")]
-        )
 
-    elif name == "search_activities":
-        keyword = arguments.get("keyword")
-        location = await get_location(keyword) if keyword else None
-        destination_city = keyword or "Paris"
-        destination_iata = location["iataCode"] if location else None
-        if location and location.get("name"):
-            destination_city = location["name"]
-        request = build_trip_request(
-            origin_iata="LON",
-            destination_city=destination_city,
-            destination_iata=destination_iata,
-            departure_date=default_departure_date(),
-            days=1,
-        )
-        search_response = await search_travel(request)
-        activities = [activity.title for activity in search_response.activities]
-        text = f"Activities in {destination_city}:\n" + ("\n".join(activities) if activities else "No activities found.")
-        return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
-
-    elif name == "plan_trip":
-        destination_name = arguments.get("destination", "Paris")
-        origin = arguments.get("origin", "LON").upper()
-        days = arguments.get("days", 3)
-        departure_date = arguments.get("departure_date") or default_departure_date()
-
-        location = await get_location(destination_name)
-        destination_iata = location["iataCode"] if location else None
-        if location and location.get("name"):
-            destination_name = location["name"]
-
-        request = build_trip_request(
-            origin_iata=origin,
-            destination_city=destination_name,
-            destination_iata=destination_iata,
-            departure_date=departure_date,
-            days=days,
-        )
-        search_response = await search_travel(request)
-        flights = search_response.flights
+async def _handle_search_activities(arguments: dict) -> types.CallToolResult:
+    keyword = arguments.get("keyword")
+    location = await get_location(keyword) if keyword else None
+    destination_city = keyword or "Paris"
+    destination_iata = location["iataCode"] if location else None
+    if location and location.get("name"):
+        destination_city = location["name"]
+    request = build_trip_request(
+        origin_iata="LON",
+        destination_city=destination_city,
+        destination_iata=destination_iata,
+        departure_date=default_departure_date(),
+        days=1,
+        destination_lat=location["latitude"] if location else None,
+        destination_lng=location["longitude"] if location else None,
+    )
+    search_response = await _search_travel(request)
+    activities = [activity.title for activity in search_response.activities]
+    text = f"Activities in {destination_city}:\n" + ("\n".join(activities) if activities else "No activities found.")
+    return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+
+
+def _build_itinerary(
+    destination_name: str, activity_titles: Iterable[str], days: int
+) -> List[ItineraryDay]:
+    """Spread activities over the trip, two per day, with unique fallbacks when supply is low."""
+    activity_pool = list(dict.fromkeys(activity_titles))
+    itinerary: List[ItineraryDay] = []
+    cursor = 0
+    for i in range(1, days + 1):
+        day_activities = []
+        for slot in range(2):
+            if cursor < len(activity_pool):
+                day_activities.append(activity_pool[cursor])
+                cursor += 1
+            else:
+                day_activities.append(
+                    f"Self-guided exploration in {destination_name} (Day {i}, stop {slot + 1})"
+                )
+        day_activities.append("Dinner at a local restaurant")
+        itinerary.append(ItineraryDay(day=i, activities=day_activities))
+    return itinerary
+
+
+async def _handle_plan_trip(arguments: dict) -> types.CallToolResult:
+    destination_name = arguments.get("destination", "Paris")
+    origin = arguments.get("origin", "LON").upper()
+    days = arguments.get("days", 3)
+    departure_date = arguments.get("departure_date") or default_departure_date()
+
+    location = await get_location(destination_name)
+    destination_iata = location["iataCode"] if location else None
+    if location and location.get("name"):
+        destination_name = location["name"]
+
+    request = build_trip_request(
+        origin_iata=origin,
+        destination_city=destination_name,
+        destination_iata=destination_iata,
+        departure_date=departure_date,
+        days=days,
+        destination_lat=location["latitude"] if location else None,
+        destination_lng=location["longitude"] if location else None,
+    )
+    search_response = await _search_travel(request)
+    flights = search_response.flights
 
-        hotels = []
-        for hotel_offer in search_response.hotels:
-            hotels.append(
-                {
-                    "name": hotel_offer.hotel_name,
-                    "image": "https://images.unsplash.com/photo-1566073771259-6a8506099945?auto=format&fit=crop&w=400",
-                    "price": f"${hotel_offer.nightly_price.amount:.0f}/night" if hotel_offer.nightly_price else "Check for rates",
-                    "rating": f"{hotel_offer.star_rating:.1f}" if hotel_offer.star_rating else "N/A",
-                }
+    hotels: List[HotelCard] = []
+    for hotel_offer in search_response.hotels:
+        hotels.append(
+            HotelCard(
+                name=hotel_offer.hotel_name,
+                image=DEFAULT_HOTEL_IMAGE,
+                price=(
+                    _format_nightly_price(hotel_offer.nightly_price.amount)
+                    if hotel_offer.nightly_price
+                    else "Check for rates"
+                ),
+                rating=f"{hotel_offer.star_rating:.1f}" if hotel_offer.star_rating else "N/A",
             )
+        )
 
-        # Generate itinerary from real activities, with unique fallbacks when supply is low.
-        itinerary = []
-        activity_pool: List[str] = []
-        for activity in search_response.activities:
-            if activity.title not in activity_pool:
-                activity_pool.append(activity.title)
-
-        cursor = 0
-        for i in range(1, days + 1):
-            day_activities = []
-            for slot in range(2):
-                if cursor < len(activity_pool):
-                    day_activities.append(activity_pool[cursor])
-                    cursor += 1
-                else:
-                    day_activities.append(
-                        f"Self-guided exploration in {destination_name} (Day {i}, stop {slot + 1})"
-                    )
-
-            day_activities.append("Dinner at a local restaurant")
-            
-            itinerary.append({
-                "day": i,
-                "activities": day_activities
-            })
-
-        trip_data = {
-            "destination": destination_name,
-            "hotels": hotels,
-            "itinerary": itinerary,
-            "request_id": search_response.request_id,
-        }
+    itinerary = _build_itinerary(
+        destination_name, (activity.title for activity in search_response.activities), days
+    )
 
-        if flights:
-            best_flight = flights[0]
-            flight_msg = (
-                " Best flight found: "
-                f"{best_flight.segments[0].from_}->{best_flight.segments[0].to} "
-                f"{best_flight.total_price.amount:.2f} {best_flight.total_price.currency}"
-            )
-        else:
-            flight_msg = " (No direct flights found for this date)"
-
-        return types.CallToolResult(
-            content=[
-                types.TextContent(
-                    type="text",
-                    text=f"I've planned a {days}-day trip to {destination_name} starting {departure_date}!{flight_msg}"
-                )
-            ],
-            structuredContent=trip_data,
-            _meta={
-                "openai/outputTemplate": "ui://widget/trip-plan.html",
-                "openai/toolInvocation/invoking": f"Planning your trip to {destination_name}...",
-                "openai/toolInvocation/invoked": f"Trip to {destination_name} planned."
-            }
+    trip_data = {
+        "destination": destination_name,
+        "hotels": hotels,
+        "itinerary": itinerary,
+        "request_id": search_response.request_id,
+    }
+
+    if flights:
+        best_flight = flights[0]
+        flight_msg = (
+            " Best flight found: "
+            f"{best_flight.segments[0].from_}->{best_flight.segments[0].to} "
+            f"{best_flight.total_price.amount:.2f} {best_flight.total_price.currency}"
         )
-    
     else:
+        flight_msg = " (No direct flights found for this date)"
+
+    return types.CallToolResult(
+        content=[
+            types.TextContent(
+                type="text",
+                text=f"I've planned a {days}-day trip to {destination_name} starting {departure_date}!{flight_msg}"
+            )
+        ],
+        structuredContent=trip_data,
+        _meta={
+            "openai/outputTemplate": "ui://widget/trip-plan.html",
+            "openai/toolInvocation/invoking": f"Planning your trip to {destination_name}...",
+            "openai/toolInvocation/invoked": f"Trip to {destination_name} planned."
+        }
+    )
+
+
+_TOOL_HANDLERS: Dict[str, Callable[[dict], Awaitable[types.CallToolResult]]] = {
+    "search_flights": _handle_search_flights,
+    "search_activities": _handle_search_activities,
+    "plan_trip": _handle_plan_trip,
+}
+
+
+@mcp_server.call_tool()
+async def call_tool(name: str, arguments: dict) -> types.CallToolResult:
+    handler = _TOOL_HANDLERS.get(name)
+    if handler is None:
         raise ValueError(f"Unknown tool: {name}")
+    return await handler(arguments)
 
 
 # Initialize FastAPI app with Streamable HTTP session lifecycle.
@@ -642,17 +1057,41 @@ streamable_session_manager = StreamableHTTPSessionManager(
 )
 
 
+AMADEUS_WARMUP_TIMEOUT = 10
+
+
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
-    async with streamable_session_manager.run():
-        yield
+    global _amadeus_executor
+    # Warm the widget caches before accepting MCP traffic. Without a widget build the
+    # REST API must still start; only the widget resource stays unavailable.
+    if WIDGET_INDEX_PATH.exists():
+        get_widget_html_bytes()
+    else:
+        logger.warning("Widget HTML not found at %s; skipping widget cache warmup", WIDGET_INDEX_PATH)
+    get_widget_meta()
+    _amadeus_executor = ThreadPoolExecutor(
+        max_workers=AMADEUS_MAX_WORKERS, thread_name_prefix="amadeus"
+    )
+    if amadeus is not None:
+        # One real lookup fetches the SDK's OAuth token (and caches a popular city), so
+        # the first user request doesn't pay for it. A failure here must not block startup.
+        try:
+            await asyncio.wait_for(get_location("Paris"), timeout=AMADEUS_WARMUP_TIMEOUT)
+        except Exception as error:
+            logger.warning("Amadeus warmup failed: %r", error)
+    try:
+        async with streamable_session_manager.run():
+            yield
+    finally:
+        executor, _amadeus_executor = _amadeus_executor, None
+        executor.shutdown(wait=False, cancel_futures=True)
+        if redis_client is not None:
+            await redis_client.aclose()
 
 
 def _openapi_server_url() -> str:
-    return (
-        os.getenv("APP_HOST", "").rstrip("/")
-        or "http://localhost:8000"
-    )
+    return APP_HOST or "http://localhost:8000"
 
 
 app = FastAPI(
@@ -664,8 +1103,75 @@ app = FastAPI(
 app.router.redirect_slashes = False
 app.add_middleware(ProxyHeadersMiddleware, trusted_hosts="*")
 
-search_store: Dict[str, SearchResponse] = {}
-itinerary_store: Dict[str, SaveItineraryRequest] = {}
+@dataclass(frozen=True)
+class StoredSearch:
+    """A search response plus per-category price columns, precomputed once for refine_results."""
+    response: SearchResponse
+    flight_prices: Tuple[float, ...]
+    hotel_prices: Tuple[float, ...]
+    activity_prices: Tuple[float, ...]
+    # Highest price across all categories; any max_price at or above it filters nothing.
+    price_ceiling: float
+
+    @classmethod
+    def from_response(cls, response: SearchResponse) -> "StoredSearch":
+        flight_prices = tuple(offer.total_price.amount for offer in response.flights)
+        hotel_prices = tuple(offer.total_price.amount for offer in response.hotels)
+        activity_prices = tuple(offer.total_price.amount for offer in response.activities)
+        return cls(
+            response=response,
+            flight_prices=flight_prices,
+            hotel_prices=hotel_prices,
+            activity_prices=activity_prices,
+            price_ceiling=max((*flight_prices, *hotel_prices, *activity_prices), default=0.0),
+        )
+
+
+def _within_price(offers: List[Any], prices: Tuple[float, ...], max_price: float) -> List[Any]:
+    return [offer for offer, price in zip(offers, prices) if price <= max_price]
+
+
+# Bounded in-memory stores. Searches expire once a refine session is realistically
+# over; saved itineraries are only evicted least-recently-used.
+SEARCH_STORE_MAXSIZE = int(os.getenv("SEARCH_STORE_MAXSIZE", "10000"))
+SEARCH_STORE_TTL_SECONDS = int(os.getenv("SEARCH_STORE_TTL_SECONDS", "3600"))
+ITINERARY_STORE_MAXSIZE = int(os.getenv("ITINERARY_STORE_MAXSIZE", "20000"))
+
+search_store: TTLCache = TTLCache(maxsize=SEARCH_STORE_MAXSIZE, ttl=SEARCH_STORE_TTL_SECONDS)
+itinerary_store: LRUCache = LRUCache(maxsize=ITINERARY_STORE_MAXSIZE)
+
+
+# With REDIS_URL set, searches are also written to Redis so a refine can land on any
+# worker. Redis is then the source of truth, since a refine on another worker replaces
+# the stored search there; the in-memory store is only read when Redis is unset or fails.
+async def _save_search(response: SearchResponse) -> None:
+    search_store[response.request_id] = StoredSearch.from_response(response)
+    if redis_client is None:
+        return
+    try:
+        await redis_client.set(
+            f"search:{response.request_id}",
+            response.model_dump_json(by_alias=True),
+            ex=SEARCH_STORE_TTL_SECONDS,
+        )
+    except RedisError as error:
+        logger.warning("Redis write failed (search): %s", error)
+
+
+async def _load_search(request_id: str) -> Optional[StoredSearch]:
+    stored = search_store.get(request_id)
+    if redis_client is None:
+        return stored
+    try:
+        raw = await redis_client.get(f"search:{request_id}")
+    except RedisError as error:
+        logger.warning("Redis read failed (search): %s", error)
+        return stored
+    if raw is None:
+        return stored
+    stored = StoredSearch.from_response(SearchResponse.model_validate_json(raw))
+    search_store[request_id] = stored
+    return stored
 
 
 def _safe_iata(location: LocationModel, fallback: str) -> str:
@@ -674,57 +1180,148 @@ def _safe_iata(location: LocationModel, fallback: str) -> str:
     return fallback
 
 
+def _provider_result(result: Any, label: str) -> List[Dict[str, Any]]:
+    """Unwrap an asyncio.gather result, treating an unexpected provider failure as no offers."""
+    if isinstance(result, BaseException):
+        logger.error("Amadeus Error (%s): unexpected failure", label, exc_info=result)
+        return []
+    return result
+
+
 def default_departure_date() -> str:
     return (datetime.now(timezone.utc) + timedelta(days=30)).date().isoformat()
 
 
+_ISO_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def _parse_iso_date(value: str) -> date:
+    """Parse a YYYY-MM-DD date, rejecting the other ISO 8601 forms fromisoformat accepts."""
+    if not _ISO_DATE_RE.fullmatch(value):
+        raise ValueError(f"time data {value!r} does not match format '%Y-%m-%d'")
+    return date.fromisoformat(value)
+
+
 def build_trip_request(
     origin_iata: str,
     destination_city: str,
     departure_date: str,
     destination_iata: Optional[str] = None,
     days: int = 3,
+    destination_lat: Optional[float] = None,
+    destination_lng: Optional[float] = None,
+) -> TripRequest:
+    # Tool handlers only read the request, so repeated identical calls share one instance.
+    return _build_trip_request_cached(
+        origin_iata,
+        destination_city,
+        departure_date,
+        destination_iata,
+        days,
+        destination_lat,
+        destination_lng,
+    )
+
+
+@lru_cache(maxsize=256)
+def _build_trip_request_cached(
+    origin_iata: str,
+    destination_city: str,
+    departure_date: str,
+    destination_iata: Optional[str],
+    days: int,
+    destination_lat: Optional[float],
+    destination_lng: Optional[float],
 ) -> TripRequest:
-    start_date = datetime.strptime(departure_date, "%Y-%m-%d").date()
+    start_date = _parse_iso_date(departure_date)
     end_date = start_date + timedelta(days=max(days, 1) - 1)
-    return TripRequest(
+    # Locations carry tool-supplied IATA codes, so they are still validated; the dates
+    # and traveler are derived here and the wrapper only nests validated parts.
+    return TripRequest.model_construct(
         origin=LocationModel(iata=origin_iata, city=origin_iata),
         destination=LocationModel(
             iata=destination_iata,
             city=destination_city,
+            lat=destination_lat,
+            lng=destination_lng,
         ),
-        dates=DateRange(
-            start_date=start_date.isoformat(),
+        dates=DateRange.model_construct(
+            start_date=departure_date,
             end_date=end_date.isoformat(),
         ),
-        travelers=Traveler(adults=1),
+        travelers=Traveler.model_construct(adults=1),
     )
 
 
-@app.post("/v1/search_travel", response_model=SearchResponse, operation_id="search_travel")
-async def search_travel(request: TripRequest):
-    request_id = str(uuid4())
-    destination_iata = _safe_iata(request.destination, "PAR")
+def _json_response(model: BaseModel) -> Response:
+    """Serialize a response model straight to JSON bytes, skipping jsonable_encoder."""
+    return Response(content=model.model_dump_json(by_alias=True), media_type="application/json")
+
+
+async def _search_travel(request: TripRequest) -> SearchResponse:
+    request_id = secrets.token_hex(16)
+    city = CITY_INDEX.get((request.destination.city or "").strip().casefold())
+    destination_iata = _safe_iata(request.destination, city.iata if city else "PAR")
     origin_iata = _safe_iata(request.origin, "LON")
     destination_name = request.destination.city or destination_iata
     warnings: List[str] = []
 
-    flights_raw = await search_flight_offers(
-        origin_iata,
-        destination_iata,
-        request.dates.start_date,
-    )
+    # Tool handlers pass coordinates they already resolved, so the activity leg can start
+    # alongside flights and hotels instead of waiting on another location lookup.
+    async def destination_activities() -> List[Dict[str, Any]]:
+        latitude = request.destination.lat
+        longitude = request.destination.lng
+        if (latitude is None or longitude is None) and city:
+            latitude, longitude = city.lat, city.lng
+        if latitude is None or longitude is None:
+            location = await get_location(destination_name)
+            if location:
+                latitude = location.get("latitude")
+                longitude = location.get("longitude")
+        if latitude is None or longitude is None:
+            return []
+        return await get_activities(latitude, longitude)
+
+    if amadeus is None:
+        # Without credentials every provider returns nothing; skip scheduling the fan-out.
+        flights_raw: List[Dict[str, Any]] = []
+        hotels_raw: List[Dict[str, Any]] = []
+        activities_raw: List[Dict[str, Any]] = []
+    else:
+        # Flights, hotels and activities are independent, so fan them out concurrently.
+        flights_raw, hotels_raw, activities_raw = await asyncio.gather(
+            search_flight_offers(
+                origin_iata,
+                destination_iata,
+                request.dates.start_date,
+            ),
+            get_hotels(
+                city_code=destination_iata,
+                check_in_date=request.dates.start_date,
+                check_out_date=request.dates.end_date,
+                adults=request.travelers.adults,
+            ),
+            destination_activities(),
+            return_exceptions=True,
+        )
+        flights_raw = _provider_result(flights_raw, "Flights")
+        hotels_raw = _provider_result(hotels_raw, "Hotels")
+        activities_raw = _provider_result(activities_raw, "Activities")
+
+    # Offers are assembled from provider data the _fetch_* helpers have already
+    # normalised, so skip re-validation with model_construct; inbound requests are
+    # still validated.
     flights: List[FlightOffer] = []
     for idx, offer in enumerate(flights_raw):
         flights.append(
-            FlightOffer(
+            FlightOffer.model_construct(
                 id=f"flight_{request_id}_{idx}",
                 provider="amadeus",
-                total_price=Money(
+                total_price=Money.model_construct(
                     amount=offer["price_total"],
                     currency=offer["currency"],
                 ),
-                segments=[Segment(**segment) for segment in offer["segments"]],
+                segments=[Segment.model_construct(**segment) for segment in offer["segments"]],
                 fare_rules_summary=offer["fare_rules_summary"],
                 refundable=offer["refundable"],
                 booking_mode="redirect",
@@ -732,34 +1329,28 @@ async def search_travel(request: TripRequest):
             )
         )
     if not flights:
-        warnings.append("No live flight offers were returned from Amadeus for this query.")
+        warnings.append(NO_FLIGHTS_WARNING)
 
-    hotels_raw = await get_hotels(
-        city_code=destination_iata,
-        check_in_date=request.dates.start_date,
-        check_out_date=request.dates.end_date,
-        adults=request.travelers.adults,
-    )
     hotels: List[HotelOffer] = []
     for idx, hotel in enumerate(hotels_raw):
         star_rating = hotel["rating"] if hotel["rating"] > 0 else None
         total_amount = hotel["total_amount"]
         nightly_amount = hotel["nightly_amount"]
         hotels.append(
-            HotelOffer(
+            HotelOffer.model_construct(
                 id=f"hotel_{request_id}_{idx}",
                 provider="expedia_rapid",
                 hotel_name=hotel["name"],
                 star_rating=star_rating,
-                total_price=Money(amount=total_amount, currency=hotel["currency"]),
+                total_price=Money.model_construct(amount=total_amount, currency=hotel["currency"]),
                 nightly_price=(
-                    Money(amount=nightly_amount, currency=hotel["currency"])
+                    Money.model_construct(amount=nightly_amount, currency=hotel["currency"])
                     if nightly_amount is not None
                     else None
                 ),
                 cancellation_policy_summary=hotel["cancellation"],
                 refundable=bool(hotel["cancellation"]),
-                location=HotelLocation(
+                location=HotelLocation.model_construct(
                     lat=hotel["latitude"],
                     lng=hotel["longitude"],
                     area=destination_name,
@@ -770,30 +1361,18 @@ async def search_travel(request: TripRequest):
             )
         )
     if not hotels:
-        warnings.append("No live hotel offers were returned from Amadeus for this query.")
-
-    latitude = request.destination.lat
-    longitude = request.destination.lng
-    if latitude is None or longitude is None:
-        location = await get_location(destination_name)
-        if location:
-            latitude = location.get("latitude")
-            longitude = location.get("longitude")
-
-    activities_raw = []
-    if latitude is not None and longitude is not None:
-        activities_raw = await get_activities(latitude, longitude)
+        warnings.append(NO_HOTELS_WARNING)
 
     activities: List[ActivityOffer] = []
     for idx, activity in enumerate(activities_raw):
         rating = activity["rating"] if activity["rating"] > 0 else None
         activities.append(
-            ActivityOffer(
+            ActivityOffer.model_construct(
                 id=f"activity_{request_id}_{idx}",
                 provider="viator",
                 title=activity["title"],
                 duration_minutes=None,
-                total_price=Money(amount=activity["amount"], currency=activity["currency"]),
+                total_price=Money.model_construct(amount=activity["amount"], currency=activity["currency"]),
                 rating=rating,
                 rating_count=None,
                 cancellation_policy_summary=activity["description"],
@@ -803,9 +1382,9 @@ async def search_travel(request: TripRequest):
             )
         )
     if not activities:
-        warnings.append("No live activities were returned from Amadeus for this query.")
+        warnings.append(NO_ACTIVITIES_WARNING)
 
-    response = SearchResponse(
+    response = SearchResponse.model_construct(
         request_id=request_id,
         freshness_ts=utc_now_iso(),
         flights=flights,
@@ -813,34 +1392,42 @@ async def search_travel(request: TripRequest):
         activities=activities,
         warnings=warnings,
     )
-    search_store[request_id] = response
+    await _save_search(response)
     return response
 
 
+@app.post("/v1/search_travel", response_model=SearchResponse, operation_id="search_travel")
+async def search_travel(request: TripRequest):
+    return _json_response(await _search_travel(request))
+
+
 @app.post("/v1/refine_results", response_model=SearchResponse, operation_id="refine_results")
 async def refine_results(request: RefineRequest):
-    existing = search_store.get(request.request_id)
-    if not existing:
-        return SearchResponse(
-            request_id=request.request_id,
-            freshness_ts=utc_now_iso(),
-            flights=[],
-            hotels=[],
-            activities=[],
-            warnings=["Unknown request_id. Run /v1/search_travel first."],
+    stored = await _load_search(request.request_id)
+    if not stored:
+        return _json_response(
+            SearchResponse.model_construct(
+                request_id=request.request_id,
+                freshness_ts=utc_now_iso(),
+                flights=[],
+                hotels=[],
+                activities=[],
+                warnings=[UNKNOWN_REQUEST_WARNING],
+            )
         )
 
+    existing = stored.response
     max_price = request.filters.max_price.amount if request.filters.max_price else None
     flights = existing.flights
     hotels = existing.hotels
     activities = existing.activities
 
-    if max_price is not None:
-        flights = [f for f in flights if f.total_price.amount <= max_price]
-        hotels = [h for h in hotels if h.total_price.amount <= max_price]
-        activities = [a for a in activities if a.total_price.amount <= max_price]
+    if max_price is not None and max_price < stored.price_ceiling:
+        flights = _within_price(flights, stored.flight_prices, max_price)
+        hotels = _within_price(hotels, stored.hotel_prices, max_price)
+        activities = _within_price(activities, stored.activity_prices, max_price)
 
-    refined = SearchResponse(
+    refined = SearchResponse.model_construct(
         request_id=existing.request_id,
         freshness_ts=utc_now_iso(),
         flights=flights,
@@ -848,8 +1435,8 @@ async def refine_results(request: RefineRequest):
         activities=activities,
         warnings=existing.warnings,
     )
-    search_store[request.request_id] = refined
-    return refined
+    await _save_search(refined)
+    return _json_response(refined)
 
 
 @app.post("/v1/start_booking", response_model=StartBookingResponse, operation_id="start_booking")
@@ -865,7 +1452,7 @@ async def start_booking(request: StartBookingRequest):
 
 @app.post("/v1/save_itinerary", response_model=SaveItineraryResponse, operation_id="save_itinerary")
 async def save_itinerary(request: SaveItineraryRequest):
-    itinerary_id = str(uuid4())
+    itinerary_id = secrets.token_hex(16)
     itinerary_store[itinerary_id] = request
     return SaveItineraryResponse(itinerary_id=itinerary_id)
 
@@ -905,9 +1492,33 @@ async def handle_mcp_sse(request: Request):
 # Mount the message endpoint directly as an ASGI app to avoid FastAPI sending a second response.
 app.mount("/messages", transport.handle_post_message)
 
+# Widget assets aren't content-hashed, so cache them for a bounded window rather than
+# marking them immutable; StaticFiles still answers revalidations with 304s.
+WIDGET_CACHE_MAX_AGE = int(os.getenv("WIDGET_CACHE_MAX_AGE", "3600"))
+
+
+class CachedStaticFiles(StaticFiles):
+    def file_response(self, *args: Any, **kwargs: Any) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = f"public, max-age={WIDGET_CACHE_MAX_AGE}"
+        return response
+
+
+# The widget page is served from memory with APP_HOST already substituted; these routes
+# are registered ahead of the /widget mount so they take precedence over the raw file.
+@app.get("/widget/", include_in_schema=False)
+@app.get("/widget/index.html", include_in_schema=False)
+async def widget_index():
+    return Response(
+        content=get_widget_html_bytes(),
+        media_type="text/html",
+        headers={"Cache-Control": f"public, max-age={WIDGET_CACHE_MAX_AGE}"},
+    )
+
+
 # Serve raw widget assets (CSS/JS)
 if WIDGET_DIR.exists():
-    app.mount("/widget", StaticFiles(directory=WIDGET_DIR, html=True), name="widget")
+    app.mount("/widget", CachedStaticFiles(directory=WIDGET_DIR, html=True), name="widget")
 
 # Serve domain verification and other standards files.
 if WELL_KNOWN_DIR.exists():
@@ -0,0 +1,51 @@
+import asyncio
+from types import SimpleNamespace
+from amadeus import ResponseError
+import main
+from main import TokenBucket, _amadeus_get
+
+async def test_fractional_rate():
+    print("Testing TokenBucket with a fractional rate...")
+    bucket = TokenBucket(2.5)
+    slow_bucket = TokenBucket(0.5)
+    loop = asyncio.get_running_loop()
+
+    start = loop.time()
+    for _ in range(3):
+        await asyncio.wait_for(bucket.acquire(), timeout=5)
+    spacing = loop.time() - start
+    print(f"3 acquisitions at 2.5/s took {spacing:.2f}s")
+
+    await asyncio.wait_for(slow_bucket.acquire(), timeout=5)
+    start = loop.time()
+    await asyncio.wait_for(slow_bucket.acquire(), timeout=5)
+    slow_wait = loop.time() - start
+    print(f"Second acquisition at 0.5/s waited {slow_wait:.2f}s")
+
+    if 0.7 <= spacing < 1.2 and 1.8 <= slow_wait < 2.5:
+        print("Success: Bucket admits fractional rates and spaces calls evenly.")
+    else:
+        print("Failure: Bucket pacing did not match the configured rate.")
+
+async def test_retry_on_429():
+    print("Testing Amadeus 429 retry...")
+    calls = []
+
+    def flaky_get(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise ResponseError(SimpleNamespace(status_code=429, parsed=False, result=None, body="Too Many Requests"))
+        return SimpleNamespace(data=[{"iataCode": "PAR"}])
+
+    main._amadeus_rate_limiter = None
+    response = await _amadeus_get("locations", flaky_get, keyword="Paris")
+    print(f"Calls made: {len(calls)}, data: {response.data}")
+
+    if len(calls) == 2 and response.data[0]["iataCode"] == "PAR":
+        print("Success: Rate-limited call was retried and returned data.")
+    else:
+        print("Failure: Rate-limited call was not retried as expected.")
+
+if __name__ == "__main__":
+    asyncio.run(test_fractional_rate())
+    asyncio.run(test_retry_on_429())
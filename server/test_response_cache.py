@@ -0,0 +1,96 @@
+import asyncio
+from types import SimpleNamespace
+from amadeus import ResponseError
+import main
+from main import ResponseCache
+
+def counting_fetch(calls, value, delay=0.05):
+    async def fetch():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+    return fetch
+
+async def test_concurrent_misses_share_one_call():
+    print("Testing concurrent misses on one key...")
+    cache = ResponseCache(maxsize=8, ttl=60)
+    calls = []
+    fetch = counting_fetch(calls, {"iataCode": "PAR"})
+    results = await asyncio.gather(*[cache.get_or_fetch("paris", fetch) for _ in range(10)])
+    print(f"Upstream calls: {len(calls)}")
+
+    if len(calls) == 1 and all(result == {"iataCode": "PAR"} for result in results):
+        print("Success: 10 concurrent misses made one upstream call.")
+    else:
+        print("Failure: Concurrent misses were not coalesced.")
+
+async def test_cancelled_caller_does_not_cancel_waiters():
+    print("Testing cancellation of the first caller...")
+    cache = ResponseCache(maxsize=8, ttl=60)
+    calls = []
+    fetch = counting_fetch(calls, {"iataCode": "ROM"}, delay=0.1)
+    first = asyncio.create_task(cache.get_or_fetch("rome", fetch))
+    await asyncio.sleep(0.01)
+    second = asyncio.create_task(cache.get_or_fetch("rome", fetch))
+    await asyncio.sleep(0.01)
+    first.cancel()
+    result = await second
+    print(f"Waiter got: {result}, upstream calls: {len(calls)}")
+
+    if first.cancelled() and result == {"iataCode": "ROM"} and len(calls) == 1 and not cache._inflight:
+        print("Success: Waiting caller was served after the first caller was cancelled.")
+    else:
+        print("Failure: Cancelling the first caller affected the shared lookup.")
+
+async def test_failed_refresh_serves_stale():
+    print("Testing stale fallback on ResponseError...")
+    cache = ResponseCache(maxsize=8, ttl=60, namespace="hotels", serve_stale=True)
+    await cache.get_or_fetch("lisbon", counting_fetch([], [{"name": "Hotel Tejo"}], delay=0))
+    cache._entries.clear()
+
+    async def failing_fetch():
+        raise ResponseError(SimpleNamespace(status_code=500, parsed=False, result=None, body="Server Error"))
+
+    result = await cache.get_or_fetch("lisbon", failing_fetch)
+    print(f"Result after failed refresh: {result}")
+
+    if result == [{"name": "Hotel Tejo"}]:
+        print("Success: Failed refresh returned the last good value.")
+    else:
+        print("Failure: Failed refresh did not fall back to the stale value.")
+
+async def test_redis_hit_skips_fetch():
+    print("Testing Redis tier hit...")
+    try:
+        import fakeredis
+    except ImportError:
+        print("Skipped: fakeredis is not installed.")
+        return
+    previous = main.redis_client
+    main.redis_client = fakeredis.FakeAsyncRedis()
+    try:
+        writer = ResponseCache(maxsize=8, ttl=60, namespace="hotels", shared_ttl=600)
+        await writer.get_or_fetch(("PAR", 1), counting_fetch([], [{"name": "Hotel Lumiere"}], delay=0))
+
+        # A second cache stands in for another worker with a cold in-process tier.
+        reader = ResponseCache(maxsize=8, ttl=60, namespace="hotels", shared_ttl=600)
+        calls = []
+        result = await reader.get_or_fetch(("PAR", 1), counting_fetch(calls, [], delay=0))
+        ttl = await main.redis_client.ttl("hotels:PAR:1")
+        print(f"Result: {result}, upstream calls: {len(calls)}, Redis TTL: {ttl}")
+    finally:
+        main.redis_client = previous
+
+    if result == [{"name": "Hotel Lumiere"}] and not calls and 0 < ttl <= 600:
+        print("Success: Redis hit was served without calling fetch.")
+    else:
+        print("Failure: Redis tier did not serve the shared value.")
+
+async def run_all():
+    await test_concurrent_misses_share_one_call()
+    await test_cancelled_caller_does_not_cancel_waiters()
+    await test_failed_refresh_serves_stale()
+    await test_redis_hit_skips_fetch()
+
+if __name__ == "__main__":
+    asyncio.run(run_all())
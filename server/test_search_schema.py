@@ -0,0 +1,51 @@
+import asyncio
+from types import SimpleNamespace
+import main
+from main import SearchResponse, build_trip_request
+
+
+def fake_amadeus():
+    def respond(data):
+        return lambda **kwargs: SimpleNamespace(data=data)
+
+    locations = [{"name": "PARIS", "iataCode": "PAR", "geoCode": {"latitude": 48.85, "longitude": 2.35}}]
+    hotels = [
+        {"hotel": {"name": "Hotel Lumiere", "rating": "4", "latitude": 48.86, "longitude": 2.34, "amenities": ["WIFI"]},
+         "offers": [{"price": {"total": "300", "currency": "EUR", "variations": {"average": {"base": "100"}}},
+                     "policies": {"cancellation": {"description": {"text": "Free cancellation"}}}, "self": "https://example.test/h"}]},
+    ]
+    activities = [
+        {"name": "Louvre Tour", "price": {"amount": "20", "currencyCode": "EUR"}, "self": {"href": "https://example.test/a"}, "rating": "4.5"},
+    ]
+    flights = [
+        {"price": {"total": "120.5", "currency": "EUR"}, "itineraries": [{"segments": [
+            {"departure": {"iataCode": "LON", "at": "2027-04-10T08:00:00"}, "arrival": {"iataCode": "PAR", "at": "2027-04-10T10:00:00"},
+             "carrierCode": "AF", "number": "1"}]}],
+         "pricingOptions": {"refundableFare": True}},
+    ]
+    return SimpleNamespace(
+        reference_data=SimpleNamespace(locations=SimpleNamespace(get=respond(locations))),
+        shopping=SimpleNamespace(
+            hotel_offers_search=SimpleNamespace(get=respond(hotels)),
+            activities=SimpleNamespace(get=respond(activities)),
+            flight_offers_search=SimpleNamespace(get=respond(flights)),
+        ),
+    )
+
+async def test_search_response_round_trip():
+    print("Testing SearchResponse JSON round-trip...")
+    main.amadeus = fake_amadeus()
+    request = build_trip_request("LON", "Paris", "2027-04-10", destination_iata="PAR", days=3)
+    response = await main._search_travel(request)
+
+    payload = response.model_dump_json(by_alias=True)
+    print(f"Payload: {payload}")
+    parsed = SearchResponse.model_validate_json(payload)
+
+    if parsed.model_dump_json(by_alias=True) == payload and response.hotels and response.activities and response.flights:
+        print("Success: SearchResponse built with model_construct validates and round-trips.")
+    else:
+        print("Failure: SearchResponse did not round-trip through its schema.")
+
+if __name__ == "__main__":
+    asyncio.run(test_search_response_round_trip())